@@ -0,0 +1,873 @@
+#!/usr/bin/env python3
+"""
+Tests for the Agentic AI Documentation Generator POC
+
+Run with: python -m unittest test_poc_agentic_demo (or pytest)
+"""
+
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from poc_agentic_demo import (
+    DOCUMENTATION_INSTRUCTIONS,
+    END,
+    AgenticDocumentationSystem,
+    CircuitOpenError,
+    GraphRecursionError,
+    GraphValidationError,
+    HTTPLLMClient,
+    IgnoreRules,
+    LLMCallPolicy,
+    LLMClient,
+    LLMRateLimiter,
+    LLMRequestError,
+    LLMResponse,
+    LocalLLMServer,
+    RepositoryInfo,
+    SimulatedLLMClient,
+    StateGraph,
+    TokenBucket,
+    _percentile,
+    _requirement_name,
+    append_lists,
+    extract_manifest_dependencies,
+    splice_sections,
+    split_markdown_sections,
+)
+
+
+def initial_state():
+    return {
+        "repositories": [], "current_repo_index": 0, "generated_docs": {}, "quality_scores": {},
+        "workflow_status": "initialized", "error_log": [], "processing_stats": {},
+        "source_revisions": {}, "unchanged_repositories": [], "processed_repositories": []
+    }
+
+
+class ManifestParserTests(unittest.TestCase):
+    """Dependency names read from package manifests"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_requirement_name_strips_versions_extras_and_markers(self):
+        self.assertEqual(_requirement_name("Flask>=2.0"), "flask")
+        self.assertEqual(_requirement_name("requests[socks]==2.31.0"), "requests")
+        self.assertEqual(_requirement_name("uvicorn ; python_version >= '3.8'"), "uvicorn")
+        self.assertEqual(_requirement_name("pkg @ https://example.com/pkg-1.0.tar.gz"), "pkg")
+
+    def test_requirement_name_uses_egg_fragment_for_vcs_urls(self):
+        self.assertEqual(_requirement_name("git+https://github.com/x/y.git#egg=y"), "y")
+        self.assertEqual(_requirement_name("git+ssh://git@host/r.git@v1#egg=Some_Pkg&subdirectory=src"), "some_pkg")
+
+    def test_requirement_name_skips_unnamed_urls_and_paths(self):
+        self.assertIsNone(_requirement_name("https://example.com/archive.zip"))
+        self.assertIsNone(_requirement_name("git+https://github.com/x/y.git"))
+        self.assertIsNone(_requirement_name("./local/package"))
+
+    def test_requirements_txt(self):
+        (self.repo / "requirements.txt").write_text(
+            "# web stack\n"
+            "flask>=2.0  # pinned below 3\n"
+            "-r dev-requirements.txt\n"
+            "--index-url https://pypi.example.com/simple\n"
+            "-e git+https://github.com/x/y.git#egg=y\n"
+            "git+https://github.com/x/z.git#egg=z\n"
+            "https://example.com/archive.zip\n"
+            "./vendored\n"
+            "requests\n"
+        )
+        self.assertEqual(extract_manifest_dependencies(self.repo), ["flask", "y", "z", "requests"])
+
+    def test_pyproject_direct_references(self):
+        (self.repo / "pyproject.toml").write_text(
+            '[project]\n'
+            'name = "demo"\n'
+            'dependencies = ["httpx>=0.27", "lib @ git+https://github.com/x/lib.git"]\n'
+        )
+        self.assertEqual(extract_manifest_dependencies(self.repo), ["httpx", "lib"])
+
+    def test_no_manifest(self):
+        self.assertIsNone(extract_manifest_dependencies(self.repo))
+
+
+class IgnoreRulesTests(unittest.TestCase):
+    """The .gitignore subset used to prune repository walks"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rules(self, text: str, base: str = "", parent: IgnoreRules = None) -> IgnoreRules:
+        gitignore = self.repo / base / ".gitignore"
+        gitignore.parent.mkdir(parents=True, exist_ok=True)
+        gitignore.write_text(text)
+        return (parent or IgnoreRules()).extended(base, str(gitignore))
+
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        rules = self.rules("# logs\n*.log\n")
+        self.assertTrue(rules.is_ignored("a.log", False))
+        self.assertTrue(rules.is_ignored("src/deep/a.log", False))
+        self.assertFalse(rules.is_ignored("a.log.txt", False))
+
+    def test_leading_or_inner_slash_anchors_to_the_gitignore(self):
+        rules = self.rules("/build\ndocs/generated\n")
+        self.assertTrue(rules.is_ignored("build", True))
+        self.assertFalse(rules.is_ignored("src/build", True))
+        self.assertTrue(rules.is_ignored("docs/generated", True))
+        self.assertFalse(rules.is_ignored("src/docs/generated", True))
+
+    def test_trailing_slash_matches_directories_only(self):
+        rules = self.rules("tmp/\n")
+        self.assertTrue(rules.is_ignored("tmp", True))
+        self.assertTrue(rules.is_ignored("src/tmp", True))
+        self.assertFalse(rules.is_ignored("tmp", False))
+
+    def test_double_star(self):
+        rules = self.rules("**/cache\nlogs/**\na/**/b\n")
+        self.assertTrue(rules.is_ignored("cache", True))
+        self.assertTrue(rules.is_ignored("x/y/cache", True))
+        self.assertTrue(rules.is_ignored("logs/2024/app.txt", False))
+        self.assertFalse(rules.is_ignored("src/logs/app.txt", False))
+        self.assertTrue(rules.is_ignored("a/b", True))
+        self.assertTrue(rules.is_ignored("a/x/y/b", True))
+
+    def test_negation_re_includes_and_the_last_match_wins(self):
+        rules = self.rules("*.log\n!keep.log\n")
+        self.assertTrue(rules.is_ignored("other.log", False))
+        self.assertFalse(rules.is_ignored("keep.log", False))
+        self.assertFalse(rules.is_ignored("src/keep.log", False))
+
+        rules = self.rules("!keep.log\n*.log\n")
+        self.assertTrue(rules.is_ignored("keep.log", False))
+
+    def test_nested_gitignore_is_scoped_to_its_directory(self):
+        root = self.rules("*.md\n")
+        rules = self.rules("/out\n!README.md\n", base="sub", parent=root)
+
+        self.assertTrue(rules.is_ignored("sub/out", True))
+        self.assertFalse(rules.is_ignored("out", True))
+        self.assertFalse(rules.is_ignored("sub/x/out", True))
+        self.assertFalse(rules.is_ignored("sub/README.md", False))
+        self.assertTrue(rules.is_ignored("README.md", False))
+        self.assertTrue(rules.is_ignored("sub/NOTES.md", False))
+
+    def test_missing_gitignore_keeps_the_parent_rules(self):
+        root = self.rules("*.log\n")
+        self.assertIs(root.extended("sub", str(self.repo / "sub" / ".gitignore")), root)
+
+
+class SectionSpliceTests(unittest.TestCase):
+    """Targeted rewrites replace weak sections and leave the rest of a document alone"""
+
+    DOCUMENT = (
+        "# Project\nIntro line.\n"
+        "## Install\n\n    pip install project   \n\n\n"
+        "## Usage\nToo short\n"
+        "## Notes\n```bash\n## not a heading\n```\nTrailing text without newline"
+    )
+
+    def test_sections_split_outside_code_fences(self):
+        sections = split_markdown_sections(self.DOCUMENT)
+        self.assertEqual([title for title, _ in sections], ["", "Install", "Usage", "Notes"])
+        self.assertEqual("".join(text for _, text in sections), self.DOCUMENT)
+
+    def test_without_replacements_the_document_is_unchanged(self):
+        self.assertEqual(splice_sections(split_markdown_sections(self.DOCUMENT), {}), self.DOCUMENT)
+
+    def test_untouched_sections_stay_byte_identical(self):
+        sections = dict(split_markdown_sections(self.DOCUMENT))
+        spliced = splice_sections(split_markdown_sections(self.DOCUMENT), {"Usage": "## Usage\nRun `project --help`.\n"})
+
+        before, after = self.DOCUMENT.split(sections["Usage"])
+        self.assertEqual(spliced, before + "## Usage\nRun `project --help`.\n\n" + after)
+
+    def test_missing_sections_are_appended_with_a_heading(self):
+        spliced = splice_sections(split_markdown_sections(self.DOCUMENT), {"Testing": "Run the unit tests."})
+
+        self.assertTrue(spliced.startswith(self.DOCUMENT + "\n"))
+        self.assertTrue(spliced.endswith("\n## Testing\nRun the unit tests.\n"))
+
+
+class WorkspaceScanTests(unittest.TestCase):
+    """Which top-level directories are treated as repositories"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_output_directory_is_not_a_candidate(self):
+        system = AgenticDocumentationSystem(str(self.workspace), use_llm_cache=False)
+        for name in ("service", "agentic_documentation", ".hidden", "node_modules"):
+            (self.workspace / name).mkdir()
+
+        candidates = sorted(item.name for item in self.workspace.iterdir() if system._is_workspace_candidate(item))
+        self.assertEqual(candidates, ["service"])
+
+
+class PercentileTests(unittest.TestCase):
+    """Nearest-rank percentiles used for trace summaries and hedge delays"""
+
+    def test_nearest_rank(self):
+        self.assertEqual(_percentile([1, 2], 50), 1)
+        self.assertEqual(_percentile([1, 2, 3, 4, 5, 6], 50), 3)
+        self.assertEqual(_percentile([5, 1, 3], 50), 3)
+        self.assertEqual(_percentile(list(range(1, 21)), 95), 19)
+        self.assertEqual(_percentile(list(range(1, 21)), 100), 20)
+        self.assertEqual(_percentile([7], 1), 7)
+
+    def test_empty(self):
+        self.assertEqual(_percentile([], 95), 0.0)
+
+
+class CompiledGraphTests(unittest.IsolatedAsyncioTestCase):
+    """Execution semantics of the simplified LangGraph executor"""
+
+    @staticmethod
+    def node(func):
+        async def run(state):
+            func(state)
+            return state
+        return run
+
+    async def test_astream_reports_nested_in_place_edits(self):
+        graph = StateGraph(dict)
+        graph.add_node("write", self.node(lambda state: state["docs"]["repo"].update(readme="v2")))
+        graph.set_entry_point("write")
+        graph.add_edge("write", END)
+
+        initial_state = {"docs": {"repo": {"readme": "v1", "api": "v1"}}}
+        updates = [update async for update in graph.compile().astream(initial_state)]
+
+        self.assertEqual(updates, [("write", {"docs": {"repo": {"readme": "v2"}}})])
+
+    async def test_astream_deltas_are_not_changed_by_later_nodes(self):
+        graph = StateGraph(dict)
+        graph.add_node("first", self.node(lambda state: state["docs"].update(repo={"readme": "v1"})))
+        graph.add_node("second", self.node(lambda state: state["docs"]["repo"].update(readme="v2")))
+        graph.set_entry_point("first")
+        graph.add_edge("first", "second")
+        graph.add_edge("second", END)
+
+        updates = [update async for update in graph.compile().astream({"docs": {}})]
+
+        self.assertEqual(updates, [
+            ("first", {"docs": {"repo": {"readme": "v1"}}}),
+            ("second", {"docs": {"repo": {"readme": "v2"}}}),
+        ])
+
+
+    def fan_out_graph(self, left, right) -> StateGraph:
+        """start fans out to left and right, whose arms meet again at join"""
+        graph = StateGraph(dict)
+        graph.add_node("start", self.node(lambda state: None))
+        graph.add_node("left", left)
+        graph.add_node("right", right)
+        graph.add_node("join", self.node(lambda state: state["log"].append("join")))
+        graph.set_entry_point("start")
+        graph.add_edge("start", "left")
+        graph.add_edge("start", "right")
+        return graph
+
+    async def test_fan_out_branches_run_concurrently(self):
+        both_started = asyncio.Event()
+        started = []
+
+        async def branch(state):
+            started.append(1)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), 1)
+            return state
+
+        graph = self.fan_out_graph(branch, branch)
+        graph.add_edge(["left", "right"], "join")
+        graph.add_edge("join", END)
+
+        final_state = await graph.compile().ainvoke({"log": []})
+        self.assertEqual(final_state["log"], ["join"])
+
+    async def test_join_waits_for_the_longer_arm(self):
+        graph = self.fan_out_graph(
+            self.node(lambda state: state["log"].append("left")), self.node(lambda state: state["log"].append("right"))
+        )
+        graph.add_node("left_more", self.node(lambda state: state["log"].append("left_more")))
+        graph.add_edge("left", "left_more")
+        graph.add_edge(["left_more", "right"], "join")
+        graph.add_edge("join", END)
+        graph.add_reducer("log", append_lists)
+
+        final_state = await graph.compile().ainvoke({"log": []})
+
+        self.assertEqual(final_state["log"][-1], "join")
+        self.assertEqual(final_state["log"].count("join"), 1)
+        self.assertEqual(sorted(final_state["log"][:-1]), ["left", "left_more", "right"])
+
+    async def test_reducer_merges_concurrent_updates(self):
+        graph = self.fan_out_graph(
+            self.node(lambda state: state["log"].append("left")), self.node(lambda state: state["log"].append("right"))
+        )
+        graph.add_edge(["left", "right"], "join")
+        graph.add_edge("join", END)
+        graph.add_reducer("log", append_lists)
+
+        final_state = await graph.compile().ainvoke({"log": ["start"]})
+        self.assertEqual(final_state["log"], ["start", "left", "right", "join"])
+
+    async def test_concurrent_writes_without_a_reducer_conflict(self):
+        graph = self.fan_out_graph(
+            self.node(lambda state: state.update(status="left")), self.node(lambda state: state.update(status="right"))
+        )
+        graph.add_edge(["left", "right"], "join")
+        graph.add_edge("join", END)
+
+        with self.assertRaisesRegex(ValueError, "'status' updated by concurrent nodes 'left' and 'right'"):
+            await graph.compile().ainvoke({"log": [], "status": "new"})
+
+
+    def loop_graph(self) -> StateGraph:
+        """work and check loop until check counts to state["until"]"""
+        graph = StateGraph(dict)
+        graph.add_node("work", self.node(lambda state: state.update(n=state["n"] + 1)))
+        graph.add_node("check", self.node(lambda state: None))
+        graph.set_entry_point("work")
+        graph.add_edge("work", "check")
+        graph.add_conditional_edges("check", lambda state: "done" if state["n"] >= state["until"] else "again",
+                                    {"again": "work", "done": END})
+        return graph
+
+    def test_edge_to_unknown_node_is_rejected(self):
+        graph = self.loop_graph()
+        graph.add_edge("check", "missing")
+        with self.assertRaisesRegex(GraphValidationError, "unknown node 'missing'"):
+            graph.compile()
+
+    def test_unknown_route_target_and_unreachable_nodes_are_rejected(self):
+        graph = self.loop_graph()
+        graph.add_conditional_edges("work", lambda state: "x", {"x": "nowhere"})
+        graph.add_node("orphan", self.node(lambda state: None))
+        with self.assertRaises(GraphValidationError) as raised:
+            graph.compile()
+        self.assertIn("route 'x' of 'work' -> unknown node 'nowhere'", str(raised.exception))
+        self.assertIn("both static and conditional edges", str(raised.exception))
+
+        graph = self.loop_graph()
+        graph.add_node("orphan", self.node(lambda state: None))
+        with self.assertRaisesRegex(GraphValidationError, "unreachable nodes: orphan"):
+            graph.compile()
+
+    def test_cycle_budget_must_name_a_cycle(self):
+        graph = self.loop_graph()
+        graph.add_node("after", self.node(lambda state: None))
+        graph.add_conditional_edges("check", lambda state: "done", {"again": "work", "done": "after"})
+        graph.add_cycle_budget(["check", "after"], 2)
+        with self.assertRaisesRegex(GraphValidationError, "do not form a cycle"):
+            graph.compile()
+
+    async def test_cycle_within_budget_completes(self):
+        graph = self.loop_graph()
+        graph.add_cycle_budget(["work", "check"], 2)
+        final_state = await graph.compile().ainvoke({"n": 0, "until": 3})
+        self.assertEqual(final_state["n"], 3)
+
+    async def test_exhausted_cycle_budget_raises(self):
+        graph = self.loop_graph()
+        graph.add_cycle_budget(["work", "check"], 2)
+        with self.assertRaisesRegex(GraphRecursionError, "exceeded 2 iterations"):
+            await graph.compile().ainvoke({"n": 0, "until": 10})
+
+    async def test_exhausted_step_budget_raises(self):
+        compiled = self.loop_graph().compile(max_steps=5)
+        with self.assertRaisesRegex(GraphRecursionError, "Step budget of 5 exhausted"):
+            await compiled.ainvoke({"n": 0, "until": 10})
+
+    async def test_unknown_route_at_runtime_raises(self):
+        graph = self.loop_graph()
+        graph.conditional_edges["check"] = (lambda state: "sideways", {"again": "work", "done": END})
+        with self.assertRaisesRegex(GraphValidationError, "unknown route 'sideways'"):
+            await graph.compile().ainvoke({"n": 0, "until": 1})
+
+
+class QualityGateTests(unittest.IsolatedAsyncioTestCase):
+    """Routing out of the quality gate when documents keep scoring low"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name)
+        self.system = AgenticDocumentationSystem(
+            str(self.workspace), llm_client=SimulatedLLMClient(latency=0),
+            use_scan_cache=False, use_llm_cache=False, stream_output=False
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def gate_state(self, names, index, score, retry_count):
+        return {
+            "repositories": [RepositoryInfo(name, str(self.workspace / name), "Python", 1, "low", "missing", 1, []) for name in names],
+            "current_repo_index": index,
+            "quality_scores": {names[index]: score},
+            "retry_count": retry_count,
+        }
+
+    def test_low_score_is_improved_then_skipped(self):
+        state = self.gate_state(["a", "b"], 0, 0.1, 0)
+        self.assertEqual(self.system.quality_gate_condition(state), "improve")
+        self.assertEqual(state["retry_count"], 1)
+
+        state = self.gate_state(["a", "b"], 0, 0.1, 2)
+        self.assertEqual(self.system.quality_gate_condition(state), "next_repo")
+        self.assertEqual((state["current_repo_index"], state["retry_count"]), (1, 0))
+
+    def test_skipping_the_last_repository_finalizes(self):
+        state = self.gate_state(["a", "b"], 1, 0.1, 2)
+        self.assertEqual(self.system.quality_gate_condition(state), "finalize")
+
+    async def test_workflow_finishes_when_every_document_scores_low(self):
+        for name in ("alpha", "beta"):
+            repo = self.workspace / name
+            repo.mkdir()
+            (repo / "main.py").write_text("def main():\n    return 1\n")
+
+        with mock.patch("poc_agentic_demo.score_markdown_document", return_value=(0.1, ["forced"])):
+            final_state = await self.system.create_workflow().ainvoke(initial_state())
+
+        self.assertEqual(final_state["workflow_status"], "completed")
+        self.assertEqual(sorted(final_state["quality_scores"]), ["alpha", "beta"])
+        self.assertTrue(all(score < 0.6 for score in final_state["quality_scores"].values()))
+
+
+class Crash(BaseException):
+    """Stands in for the process dying part way through a run"""
+
+
+class CheckpointResumeTests(unittest.IsolatedAsyncioTestCase):
+    """Resuming a parallel run keeps the repositories finished before it stopped"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name)
+        for name in ("alpha", "beta", "gamma"):
+            repo = self.workspace / name
+            repo.mkdir()
+            (repo / "main.py").write_text("def main():\n    return 1\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def system(self, generate_hook) -> AgenticDocumentationSystem:
+        system = AgenticDocumentationSystem(
+            str(self.workspace), max_workers=2, llm_client=SimulatedLLMClient(latency=0),
+            use_scan_cache=False, use_llm_cache=False, stream_output=False
+        )
+        generate = system.generate_content_node
+
+        async def generate_content_node(state):
+            await generate_hook(state["repositories"][0].name)
+            return await generate(state)
+
+        system.generate_content_node = generate_content_node
+        return system
+
+    async def test_parallel_run_resumes_after_the_finished_repositories(self):
+        async def crash_on_gamma(name):
+            if name == "gamma":
+                # Give the other repositories time to finish first
+                await asyncio.sleep(0.2)
+                raise Crash()
+
+        crashed = self.system(crash_on_gamma)
+        with self.assertRaises(Crash):
+            await crashed.create_workflow().ainvoke(initial_state())
+
+        generated = []
+
+        async def record(name):
+            generated.append(name)
+
+        resumed = self.system(record)
+        workflow = resumed.create_workflow()
+        checkpoint = resumed.restore_from_checkpoint(workflow)
+        self.assertEqual(checkpoint["next_nodes"], ["process_repositories"])
+        self.assertEqual(sorted(checkpoint["state"]["processed_repositories"]), ["alpha", "beta"])
+
+        final_state = await workflow.ainvoke(initial_state(), checkpoint=checkpoint)
+
+        self.assertEqual(generated, ["gamma"])
+        self.assertEqual(sorted(final_state["quality_scores"]), ["alpha", "beta", "gamma"])
+        self.assertEqual(sorted(final_state["generated_docs"]), ["alpha", "beta", "gamma"])
+        self.assertIsNone(resumed.checkpointer.load())
+
+
+class TokenBucketTests(unittest.TestCase):
+    """Continuously refilled request and token budgets"""
+
+    def test_spends_and_refills(self):
+        bucket = TokenBucket(per_minute=60)
+        self.assertEqual(bucket.delay(60), 0.0)
+
+        bucket.take(60)
+        self.assertAlmostEqual(bucket.delay(1), 1.0, places=2)
+
+        bucket.updated -= 30
+        self.assertEqual(bucket.delay(29), 0.0)
+        self.assertAlmostEqual(bucket.level, 30, places=2)
+
+    def test_refill_stops_at_capacity(self):
+        bucket = TokenBucket(per_minute=60, capacity=10)
+        bucket.updated -= 600
+        bucket.delay(1)
+        self.assertEqual(bucket.level, 10)
+
+    def test_oversized_request_waits_only_for_a_full_bucket(self):
+        bucket = TokenBucket(per_minute=60, capacity=10)
+        bucket.take(10)
+        self.assertAlmostEqual(bucket.delay(1000), 10.0, places=2)
+
+    def test_underestimates_are_paid_back_from_future_budget(self):
+        bucket = TokenBucket(per_minute=60)
+        bucket.take(90)
+        self.assertLess(bucket.level, 0)
+        self.assertAlmostEqual(bucket.delay(1), 31.0, places=1)
+
+
+class LLMRateLimiterTests(unittest.IsolatedAsyncioTestCase):
+    """In-flight slots, budget waits and AIMD concurrency"""
+
+    async def test_in_flight_calls_are_capped_by_the_limit(self):
+        limiter = LLMRateLimiter(initial_concurrency=2)
+        await limiter.acquire(10)
+        await limiter.acquire(10)
+
+        third = asyncio.ensure_future(limiter.acquire(10))
+        await asyncio.sleep(0.01)
+        self.assertFalse(third.done())
+
+        await limiter.release(latency=0.1)
+        await asyncio.wait_for(third, 1)
+        self.assertEqual(limiter.in_flight, 2)
+
+    async def test_waits_for_request_budget(self):
+        limiter = LLMRateLimiter(requests_per_minute=600)
+        limiter.requests.level = 0
+
+        started = time.monotonic()
+        await limiter.acquire(10)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+        self.assertGreater(limiter.wait_seconds, 0)
+
+    async def test_token_estimates_are_corrected_on_release(self):
+        limiter = LLMRateLimiter(tokens_per_minute=6000)
+        await limiter.acquire(1000)
+        await limiter.release(latency=0.1, token_correction=500)
+        self.assertAlmostEqual(limiter.tokens.level, 4500, delta=1)
+
+    async def test_throttling_halves_the_limit_and_pauses_new_calls(self):
+        limiter = LLMRateLimiter(initial_concurrency=8)
+        await limiter.acquire(10)
+        await limiter.release(throttled=True, retry_after=0.1)
+
+        self.assertEqual((limiter.limit, limiter.throttled), (4, 1))
+        started = time.monotonic()
+        await limiter.acquire(10)
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    async def test_healthy_latency_raises_the_limit_and_a_spike_lowers_it(self):
+        limiter = LLMRateLimiter(initial_concurrency=4, latency_tolerance=2.0)
+        for _ in range(8):
+            await limiter.acquire(10)
+            await limiter.release(latency=0.1)
+        self.assertGreater(limiter.limit, 5)
+
+        raised = limiter.limit
+        for _ in range(8):
+            await limiter.acquire(10)
+            await limiter.release(latency=5.0)
+        self.assertLess(limiter.limit, raised)
+
+
+class ScriptedLLMClient(LLMClient):
+    """Backend that works through (delay, error) steps, answering at once when they run out"""
+
+    def __init__(self, *steps):
+        super().__init__()
+        self.steps = list(steps)
+        self.calls = 0
+
+    async def _invoke(self, prompt, model, params):
+        self.calls += 1
+        delay, error = self.steps.pop(0) if self.steps else (0, None)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return LLMResponse("answer", 0.9, 2, model, prompt_tokens=1, completion_tokens=1)
+
+
+class LLMCallPolicyTests(unittest.IsolatedAsyncioTestCase):
+    """Retries, attempt timeouts, circuit breaking and hedging around backend calls"""
+
+    def client(self, *steps, **policy_options) -> ScriptedLLMClient:
+        client = ScriptedLLMClient(*steps)
+        client.call_policy = LLMCallPolicy(**{"backoff_base": 0.001, **policy_options})
+        return client
+
+    async def test_transient_errors_are_retried_with_backoff(self):
+        client = self.client((0, ConnectionError()), (0, LLMRequestError(502, "bad gateway")))
+
+        response = await client.generate_content("prompt")
+
+        self.assertEqual(response.content, "answer")
+        self.assertEqual((client.calls, client.call_policy.retries), (3, 2))
+        self.assertEqual(client.call_policy.breaker("documentation").failures, 0)
+
+    async def test_client_errors_are_not_retried(self):
+        client = self.client((0, LLMRequestError(400, "bad request")))
+
+        with self.assertRaises(LLMRequestError):
+            await client.generate_content("prompt")
+        self.assertEqual((client.calls, client.call_policy.retries), (1, 0))
+        self.assertEqual(client.call_policy.breaker("documentation").state, "closed")
+
+    async def test_slow_attempt_times_out_and_is_retried(self):
+        client = self.client((1.0, None), attempt_timeout=0.05)
+
+        await client.generate_content("prompt")
+
+        self.assertEqual((client.calls, client.call_policy.retries), (2, 1))
+
+    async def test_retries_stop_at_the_deadline(self):
+        client = self.client(*[(1.0, None)] * 5, attempt_timeout=0.05, deadline=0.12, backoff_base=0.05)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.generate_content("prompt")
+        self.assertLess(client.calls, 5)
+
+    async def test_breaker_opens_then_half_opens_for_one_trial(self):
+        client = self.client(*[(0, ConnectionError())] * 3, failure_threshold=2, reset_timeout=0.05, max_retries=0)
+        breaker = client.call_policy.breaker("documentation")
+
+        for i in range(2):
+            with self.assertRaises(ConnectionError):
+                await client.generate_content(f"prompt {i}")
+        self.assertEqual((breaker.state, breaker.times_opened), ("open", 1))
+
+        with self.assertRaises(CircuitOpenError):
+            await client.generate_content("rejected")
+        self.assertEqual(client.calls, 2)
+
+        # A failed trial reopens the circuit at once
+        await asyncio.sleep(0.06)
+        with self.assertRaises(ConnectionError):
+            await client.generate_content("failed trial")
+        self.assertEqual((breaker.state, breaker.times_opened), ("open", 2))
+
+        await asyncio.sleep(0.06)
+        await client.generate_content("trial")
+        self.assertEqual((breaker.state, breaker.failures), ("closed", 0))
+
+    async def test_throttling_waits_are_not_attempt_timeouts(self):
+        client = self.client(attempt_timeout=0.1)
+        client.rate_limiter = LLMRateLimiter()
+        client.rate_limiter._paused_until = time.monotonic() + 0.2
+
+        await client.generate_content("prompt")
+
+        policy = client.call_policy
+        self.assertEqual((client.calls, policy.retries), (1, 0))
+        self.assertEqual(policy.breaker("documentation").failures, 0)
+        self.assertLess(max(policy.latencies["documentation"]), 0.1)
+
+    async def test_throttled_stream_is_not_timed_out(self):
+        client = self.client(attempt_timeout=0.1)
+        client.rate_limiter = LLMRateLimiter()
+        client.rate_limiter._paused_until = time.monotonic() + 0.2
+
+        chunks = [chunk async for chunk in client.stream_content("prompt")]
+
+        self.assertEqual(chunks, ["answer"])
+        self.assertEqual((client.calls, client.call_policy.retries), (1, 0))
+
+    async def test_slow_primary_is_hedged(self):
+        client = self.client((1.0, None), hedge=True, hedge_min_samples=3)
+        for _ in range(3):
+            client.call_policy.observe("documentation", 0.01)
+
+        started = time.monotonic()
+        await client.generate_content("prompt")
+
+        policy = client.call_policy
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual((client.calls, policy.hedges_fired, policy.hedges_won), (2, 1, 1))
+
+    async def test_hedge_clock_starts_after_the_limiter(self):
+        client = self.client(hedge=True, hedge_min_samples=3)
+        client.rate_limiter = LLMRateLimiter()
+        client.rate_limiter._paused_until = time.monotonic() + 0.1
+        for _ in range(3):
+            client.call_policy.observe("documentation", 0.01)
+
+        await client.generate_content("prompt")
+
+        self.assertEqual((client.calls, client.call_policy.hedges_fired), (1, 0))
+
+
+class LLMClientTests(unittest.TestCase):
+    """Base client contract"""
+
+    def test_base_client_is_abstract(self):
+        with self.assertRaises(TypeError):
+            LLMClient()
+
+
+class LocalLLMServerTests(unittest.IsolatedAsyncioTestCase):
+    """HTTPLLMClient driven against the local stand-in server"""
+
+    async def asyncSetUp(self):
+        self.backend = SimulatedLLMClient(latency=0)
+        self.server = None
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.aclose()
+        if self.server:
+            await self.server.stop()
+
+    async def start(self, requests_per_minute=None, **client_options) -> HTTPLLMClient:
+        self.server = LocalLLMServer(backend=self.backend, requests_per_minute=requests_per_minute)
+        client = HTTPLLMClient(await self.server.start(), **client_options)
+        self.clients.append(client)
+        return client
+
+    async def test_sequential_requests_reuse_one_keep_alive_connection(self):
+        client = await self.start(pool_size=1)
+        for i in range(3):
+            response = await client.generate_content(f"Generate README documentation {i}")
+            self.assertTrue(response.content.startswith("# Project Documentation"))
+
+        self.assertEqual(client.pool.connections_opened, 1)
+        self.assertEqual(self.server.connections_accepted, 1)
+        self.assertEqual(self.server.requests_served, 3)
+
+    async def test_concurrent_requests_stay_within_pool_size(self):
+        client = await self.start(pool_size=2)
+        responses = await asyncio.gather(*(client.generate_content(f"Generate API docs {i}") for i in range(6)))
+
+        self.assertEqual(len(responses), 6)
+        self.assertLessEqual(client.pool.connections_opened, 2)
+
+    async def test_throttled_request_is_retried_after_retry_after(self):
+        client = await self.start(requests_per_minute=600)
+        self.server.request_budget.level = 1
+
+        responses = await asyncio.gather(*(client.generate_content(f"Generate README {i}") for i in range(2)))
+
+        self.assertEqual(len(responses), 2)
+        self.assertGreaterEqual(self.server.requests_rejected, 1)
+        self.assertGreaterEqual(client.rate_limiter.throttled, 1)
+
+    async def test_throttling_raises_once_retries_are_exhausted(self):
+        client = await self.start(requests_per_minute=600)
+        client.call_policy = None
+        client.rate_limiter.max_retries = 0
+        self.server.request_budget.level = 0
+
+        with self.assertRaises(LLMRequestError) as raised:
+            await client.generate_content("Generate README")
+        self.assertEqual(raised.exception.status, 429)
+        self.assertIn('retry-after', raised.exception.headers)
+
+    async def test_error_status_is_not_retried(self):
+        client = await self.start()
+        client.completions_path = "/v1/missing"
+
+        with self.assertRaises(LLMRequestError) as raised:
+            await client.generate_content("Generate README")
+        self.assertEqual(raised.exception.status, 404)
+        self.assertEqual(self.server.requests_served, 1)
+
+    async def test_sse_stream_reassembles_the_full_answer(self):
+        client = await self.start()
+        prompt = "Generate architecture documentation"
+
+        chunks = [chunk async for chunk in client.stream_content(prompt)]
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), self.backend.render(prompt))
+        self.assertEqual(client.completion_token_count, self.backend.tokenizer.count("".join(chunks)))
+        self.assertEqual(client.pool.connections_opened, 1)
+
+    async def collect(self, client, prompt):
+        return "".join([chunk async for chunk in client.stream_content(prompt)])
+
+    async def check_more_streams_than_connections(self, client):
+        prompts = [f"Generate architecture documentation {i}" for i in range(3)]
+
+        answers = await asyncio.wait_for(asyncio.gather(*(self.collect(client, p) for p in prompts)), 5)
+
+        self.assertEqual(answers, [self.backend.render(p) for p in prompts])
+        self.assertEqual(client.pool.connections_opened, 1)
+
+    async def test_more_streams_than_connections(self):
+        await self.check_more_streams_than_connections(await self.start(pool_size=1))
+
+    async def test_more_streams_than_connections_without_a_rate_limiter(self):
+        client = await self.start(pool_size=1)
+        client.rate_limiter = None
+        await self.check_more_streams_than_connections(client)
+
+    async def test_abandoned_stream_gives_up_its_connection(self):
+        self.backend.latency = 0.4
+        client = await self.start(pool_size=1)
+        client.rate_limiter = None
+
+        stream = client.stream_content("Generate architecture documentation")
+        await stream.__anext__()
+        await stream.aclose()
+
+        response = await asyncio.wait_for(client.generate_content("Generate README"), 5)
+        self.assertTrue(response.content.startswith("# Project Documentation"))
+        self.assertEqual(client.pool.connections_opened, 2)
+
+    async def test_timed_out_stream_gives_up_its_connection(self):
+        self.backend.latency = 1.0
+        client = await self.start(pool_size=1)
+        client.call_policy = LLMCallPolicy(attempt_timeout=0.05, max_retries=0)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.collect(client, "Generate architecture documentation")
+
+        self.backend.latency = 0
+        client.call_policy = LLMCallPolicy()
+        response = await asyncio.wait_for(client.generate_content("Generate README"), 5)
+        self.assertTrue(response.content.startswith("# Project Documentation"))
+        self.assertEqual(client.pool.connections_opened, 2)
+
+    async def test_repeated_shared_prefix_is_reported_as_cached(self):
+        client = await self.start()
+        await client.generate_content(DOCUMENTATION_INSTRUCTIONS + "Repository: one\nGenerate README")
+        self.assertEqual(client.cached_prompt_token_count, 0)
+
+        await client.generate_content(DOCUMENTATION_INSTRUCTIONS + "Repository: two\nGenerate README")
+        self.assertEqual(
+            client.cached_prompt_token_count, self.backend.tokenizer.count(DOCUMENTATION_INSTRUCTIONS.strip())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()